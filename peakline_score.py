@@ -1,13 +1,113 @@
 # /opt/strava-web/utils/peakline_score.py
 
 import math
+import bisect
+import functools
 import logging
+import numbers
+import sys
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
+from operator import itemgetter
 import json
 
+import numpy as np
+
+try:
+    from .peakline_score_numba import score_kernel_batch, warmup_kernels
+except ImportError:  # numba не установлен - пакетный расчет идет через NumPy
+    score_kernel_batch = None
+    warmup_kernels = None
+
 logger = logging.getLogger(__name__)
 
+# Числа по модулю больше этого (в т.ч. бесконечность и огромные int) в расчет не принимаются
+_FLOAT_MAX = sys.float_info.max
+
+# Базовая скорость (км/ч) и штраф за набор высоты (минут на 100м) супер-атлета
+_RUN_BASE_SPEED = 20.0
+_RUN_CLIMB_PENALTY = 0.5
+_RIDE_BASE_SPEED = 55.0
+_RIDE_CLIMB_PENALTY = 0.3
+
+# Параметры (базовая скорость, штраф за набор) по типу активности; прочие типы считаются как велосипед
+_RIDE_PARAMS = (_RIDE_BASE_SPEED, _RIDE_CLIMB_PENALTY)
+_TYPE_PARAMS = {
+    'Run': (_RUN_BASE_SPEED, _RUN_CLIMB_PENALTY),
+    'Ride': _RIDE_PARAMS,
+}
+
+# Типы местности в порядке возрастания крутизны с коэффициентами сложности
+_TERRAIN_INFO = (
+    ('flat', 1.0),        # равнина
+    ('rolling', 1.1),     # холмистая местность
+    ('hilly', 1.25),      # горная местность
+    ('mountain', 1.5),    # высокогорье
+)
+_TERRAIN_TYPES = tuple(name for name, _ in _TERRAIN_INFO)
+_TERRAIN_COEFFICIENTS_ARRAY = np.array([coefficient for _, coefficient in _TERRAIN_INFO])
+
+# Пороги между типами местности (м набора на км)
+_TERRAIN_THRESHOLDS = (10.0, 30.0, 60.0)
+_TERRAIN_THRESHOLDS_ARRAY = np.array(_TERRAIN_THRESHOLDS)
+
+# Уровни производительности и нижние границы баллов для каждого уровня, начиная с 'Fair'
+_PERFORMANCE_THRESHOLDS = (400, 500, 600, 700, 800, 900)
+_PERFORMANCE_LEVELS = ('Needs Improvement', 'Fair', 'Average', 'Good', 'Very Good', 'Excellent', 'Elite')
+_PERFORMANCE_LEVELS_ARRAY = np.array(_PERFORMANCE_LEVELS, dtype=object)
+
+# Описания местности для текстового анализа
+_TERRAIN_DESCRIPTIONS = {
+    'flat': 'равнинной местности',
+    'rolling': 'холмистой местности',
+    'hilly': 'горной местности',
+    'mountain': 'высокогорья'
+}
+
+
+def _generate_analysis(pls_points: int, performance_level: str, terrain_type: str,
+                       difficulty_factor: float) -> str:
+    """Генерирует текстовый анализ результата"""
+    if difficulty_factor > 2.0:
+        difficulty_bucket = 2
+    elif difficulty_factor > 1.5:
+        difficulty_bucket = 1
+    else:
+        difficulty_bucket = 0
+    
+    return f"Результат {pls_points} " + _analysis_tail(
+        performance_level, terrain_type, difficulty_bucket, pls_points // 100
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _analysis_tail(performance_level: str, terrain_type: str, difficulty_bucket: int, pls_bucket: int) -> str:
+    """
+    Текст анализа после числа баллов. Зависит только от грубых корзин
+    (уровень, местность, сложность, сотни баллов), поэтому кэшируется.
+    """
+    terrain_desc = _TERRAIN_DESCRIPTIONS.get(terrain_type, 'смешанной местности')
+    
+    analysis = f"баллов соответствует уровню '{performance_level}' "
+    analysis += f"для маршрута по {terrain_desc}. "
+    
+    if difficulty_bucket == 2:
+        analysis += "Маршрут имеет высокую сложность. "
+    elif difficulty_bucket == 1:
+        analysis += "Маршрут средней сложности. "
+    else:
+        analysis += "Относительно простой маршрут. "
+    
+    if pls_bucket >= 8:
+        analysis += "Отличная производительность!"
+    elif pls_bucket >= 6:
+        analysis += "Хорошая производительность."
+    else:
+        analysis += "Есть потенциал для улучшения."
+    
+    return analysis
+
+
 class PeakLineScoreCalculator:
     """
     Калькулятор PeakLine Score (PLS) - аналог GFR от Garmin.
@@ -19,24 +119,21 @@ class PeakLineScoreCalculator:
     4. Выдает баллы от 0 до 1000
     """
     
-    def __init__(self):
-        # Базовые параметры "супер-атлета"
-        self.SUPER_ATHLETE_PARAMS = {
-            'ftp': 400,  # Watts - топовый FTP
-            'max_speed_flat': 55,  # км/ч - максимальная скорость на равнине
-            'climbing_power': 6.5,  # Watts/kg - мощность на подъеме
-            'weight': 70,  # кг - вес атлета
-            'aero_efficiency': 0.95,  # коэффициент аэродинамики
-            'rolling_resistance': 0.003,  # коэффициент сопротивления качению
-        }
-        
-        # Коэффициенты для разных типов местности
-        self.TERRAIN_COEFFICIENTS = {
-            'flat': 1.0,        # равнина
-            'rolling': 1.1,     # холмистая местность
-            'hilly': 1.25,      # горная местность
-            'mountain': 1.5,    # высокогорье
-        }
+    # Калькулятор не хранит состояния экземпляра - все параметры на уровне класса
+    __slots__ = ()
+    
+    # Базовые параметры "супер-атлета"
+    SUPER_ATHLETE_PARAMS = {
+        'ftp': 400,  # Watts - топовый FTP
+        'max_speed_flat': _RIDE_BASE_SPEED,  # км/ч - максимальная скорость на равнине
+        'climbing_power': 6.5,  # Watts/kg - мощность на подъеме
+        'weight': 70,  # кг - вес атлета
+        'aero_efficiency': 0.95,  # коэффициент аэродинамики
+        'rolling_resistance': 0.003,  # коэффициент сопротивления качению
+    }
+    
+    # Коэффициенты для разных типов местности
+    TERRAIN_COEFFICIENTS = dict(_TERRAIN_INFO)
     
     def calculate_score(self, activity_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -54,64 +151,75 @@ class PeakLineScoreCalculator:
         Returns:
             Dict с результатами расчета или None если данных недостаточно
         """
-        try:
-            # Проверяем наличие необходимых данных
-            if not self._validate_activity_data(activity_data):
-                logger.warning("Insufficient data for PeakLine Score calculation")
-                return None
-            
-            # Извлекаем базовые параметры
-            distance_km = activity_data['distance'] / 1000
-            moving_time_hours = activity_data['moving_time'] / 3600
-            elevation_gain = activity_data.get('total_elevation_gain', 0)
-            activity_type = activity_data.get('type', 'Ride')
-            
-            # Рассчитываем идеальное время
-            ideal_time = self._calculate_ideal_time(
-                distance_km, 
-                elevation_gain, 
-                activity_type
-            )
-            
-            if ideal_time is None:
-                logger.warning("Could not calculate ideal time")
-                return None
-            
-            # Рассчитываем PLS баллы
-            actual_time_hours = moving_time_hours
-            time_ratio = ideal_time / actual_time_hours if actual_time_hours > 0 else 0
-            
-            # Баллы от 0 до 1000
-            pls_points = min(1000, max(0, int(time_ratio * 1000)))
-            
-            # Дополнительная аналитика
-            terrain_type = self._classify_terrain(distance_km, elevation_gain)
-            difficulty_factor = self._calculate_difficulty_factor(distance_km, elevation_gain)
-            
-            result = {
-                'pls_points': pls_points,
-                'ideal_time_hours': round(ideal_time, 2),
-                'actual_time_hours': round(actual_time_hours, 2),
-                'time_ratio': round(time_ratio, 3),
-                'terrain_type': terrain_type,
-                'difficulty_factor': round(difficulty_factor, 2),
-                'performance_level': self._get_performance_level(pls_points),
-                'analysis': self._generate_analysis(pls_points, terrain_type, difficulty_factor)
-            }
-            
-            logger.info(f"PeakLine Score calculated: {pls_points} points")
-            return result
-            
-        except Exception as e:
-            logger.exception(f"Error calculating PeakLine Score: {e}")
+        # Проверяем наличие необходимых данных до любых вычислений
+        if not self._validate_activity_data(activity_data):
+            logger.warning("Insufficient data for PeakLine Score calculation")
             return None
+        
+        # Извлекаем базовые параметры
+        distance_km = activity_data['distance'] / 1000
+        actual_time_hours = activity_data['moving_time'] / 3600
+        elevation_gain = activity_data.get('total_elevation_gain', 0)
+        activity_type = activity_data.get('type', 'Ride')
+        
+        # Классифицируем местность один раз - тип нужен и для коэффициента, и для результата
+        terrain_type, terrain_coefficient = self._terrain_lookup(distance_km, elevation_gain)
+        
+        # Рассчитываем идеальное время
+        ideal_time = self._calculate_ideal_time(
+            distance_km, 
+            elevation_gain, 
+            activity_type,
+            terrain_coefficient
+        )
+        
+        # Рассчитываем PLS баллы от 0 до 1000 (ограничиваем до приведения к int, чтобы не переполнить)
+        time_ratio = ideal_time / actual_time_hours if actual_time_hours > 0 else 0
+        pls_points = int(min(1000.0, max(0.0, time_ratio * 1000)))
+        
+        # Дополнительная аналитика
+        difficulty_factor = self._calculate_difficulty_factor(distance_km, elevation_gain)
+        performance_level = self._get_performance_level(pls_points)
+        
+        result = {
+            'pls_points': pls_points,
+            'ideal_time_hours': round(ideal_time, 2),
+            'actual_time_hours': round(actual_time_hours, 2),
+            'time_ratio': round(time_ratio, 3),
+            'terrain_type': terrain_type,
+            'difficulty_factor': round(difficulty_factor, 2),
+            'performance_level': performance_level,
+            'analysis': _generate_analysis(pls_points, performance_level, terrain_type, difficulty_factor)
+        }
+        
+        logger.debug("PeakLine Score calculated: %d points", pls_points)
+        return result
     
     def _validate_activity_data(self, data: Dict[str, Any]) -> bool:
-        """Проверяет наличие необходимых данных для расчета"""
-        required_fields = ['distance', 'moving_time']
-        return all(field in data and data[field] is not None for field in required_fields)
+        """
+        Проверяет наличие и типы необходимых данных для расчета.
+        Дистанция и время должны быть конечными числами больше нуля,
+        набор высоты (если есть) - конечным числом.
+        """
+        distance = data.get('distance')
+        moving_time = data.get('moving_time')
+        elevation_gain = data.get('total_elevation_gain', 0)
+        return (
+            self._is_finite_number(distance) and distance > 0
+            and self._is_finite_number(moving_time) and moving_time > 0
+            and self._is_finite_number(elevation_gain)
+        )
+    
+    @staticmethod
+    def _is_finite_number(value: Any) -> bool:
+        """Число (включая числовые типы NumPy), но не bool, NaN или бесконечность"""
+        # Быстрый путь для обычных int/float; проверка через ABC заметно медленнее
+        if type(value) in (int, float):
+            return -_FLOAT_MAX <= value <= _FLOAT_MAX
+        return isinstance(value, numbers.Real) and not isinstance(value, bool) and -_FLOAT_MAX <= value <= _FLOAT_MAX
     
-    def _calculate_ideal_time(self, distance_km: float, elevation_gain: float, activity_type: str) -> Optional[float]:
+    def _calculate_ideal_time(self, distance_km: float, elevation_gain: float, activity_type: str,
+                              terrain_coefficient: float) -> float:
         """
         Рассчитывает идеальное время для супер-атлета.
         
@@ -120,53 +228,23 @@ class PeakLineScoreCalculator:
         - Влияние набора высоты
         - Тип активности
         - Аэродинамику и сопротивление
-        """
-        if distance_km <= 0:
-            return None
-        
-        # Базовая скорость в зависимости от типа активности
-        if activity_type == 'Run':
-            base_speed_kmh = 20  # км/ч для бега
-            climbing_penalty = 0.5  # минут на 100м набора высоты
-        else:  # Велосипед по умолчанию
-            base_speed_kmh = self.SUPER_ATHLETE_PARAMS['max_speed_flat']
-            climbing_penalty = 0.3  # минут на 100м набора высоты
         
-        # Время на равнине
-        flat_time_hours = distance_km / base_speed_kmh
-        
-        # Штраф за набор высоты
-        elevation_penalty_minutes = (elevation_gain / 100) * climbing_penalty
-        elevation_penalty_hours = elevation_penalty_minutes / 60
-        
-        # Коэффициент сложности маршрута
-        terrain_coefficient = self._get_terrain_coefficient(distance_km, elevation_gain)
-        
-        # Итоговое идеальное время
-        ideal_time = (flat_time_hours + elevation_penalty_hours) * terrain_coefficient
+        Дистанция должна быть больше нуля (проверяется в _validate_activity_data).
+        """
+        # Базовая скорость в зависимости от типа активности (велосипед по умолчанию)
+        base_speed_kmh, climbing_penalty = _TYPE_PARAMS.get(activity_type, _RIDE_PARAMS)
         
-        return ideal_time
+        # (время на равнине + штраф за набор высоты) * коэффициент сложности маршрута;
+        # штраф задан в минутах на 100м, поэтому в часы переводим делением на 100 * 60
+        return (distance_km / base_speed_kmh + elevation_gain * climbing_penalty / 6000) * terrain_coefficient
     
-    def _classify_terrain(self, distance_km: float, elevation_gain: float) -> str:
-        """Классифицирует тип местности"""
+    def _terrain_lookup(self, distance_km: float, elevation_gain: float) -> Tuple[str, float]:
+        """Классифицирует тип местности и возвращает его вместе с коэффициентом сложности"""
         if distance_km == 0:
-            return 'flat'
-        
-        elevation_ratio = elevation_gain / (distance_km * 1000)  # м/м
+            return _TERRAIN_INFO[0]
         
-        if elevation_ratio < 0.01:
-            return 'flat'
-        elif elevation_ratio < 0.03:
-            return 'rolling'
-        elif elevation_ratio < 0.06:
-            return 'hilly'
-        else:
-            return 'mountain'
-    
-    def _get_terrain_coefficient(self, distance_km: float, elevation_gain: float) -> float:
-        """Возвращает коэффициент сложности местности"""
-        terrain_type = self._classify_terrain(distance_km, elevation_gain)
-        return self.TERRAIN_COEFFICIENTS.get(terrain_type, 1.0)
+        elevation_per_km = elevation_gain / distance_km  # м/км
+        return _TERRAIN_INFO[bisect.bisect_right(_TERRAIN_THRESHOLDS, elevation_per_km)]
     
     def _calculate_difficulty_factor(self, distance_km: float, elevation_gain: float) -> float:
         """Рассчитывает общий коэффициент сложности маршрута"""
@@ -183,53 +261,8 @@ class PeakLineScoreCalculator:
     
     def _get_performance_level(self, pls_points: int) -> str:
         """Определяет уровень производительности по баллам"""
-        if pls_points >= 900:
-            return 'Elite'
-        elif pls_points >= 800:
-            return 'Excellent'
-        elif pls_points >= 700:
-            return 'Very Good'
-        elif pls_points >= 600:
-            return 'Good'
-        elif pls_points >= 500:
-            return 'Average'
-        elif pls_points >= 400:
-            return 'Fair'
-        else:
-            return 'Needs Improvement'
+        return _PERFORMANCE_LEVELS[bisect.bisect_right(_PERFORMANCE_THRESHOLDS, pls_points)]
     
-    def _generate_analysis(self, pls_points: int, terrain_type: str, difficulty_factor: float) -> str:
-        """Генерирует текстовый анализ результата"""
-        performance_level = self._get_performance_level(pls_points)
-        
-        terrain_descriptions = {
-            'flat': 'равнинной местности',
-            'rolling': 'холмистой местности',
-            'hilly': 'горной местности',
-            'mountain': 'высокогорья'
-        }
-        
-        terrain_desc = terrain_descriptions.get(terrain_type, 'смешанной местности')
-        
-        analysis = f"Результат {pls_points} баллов соответствует уровню '{performance_level}' "
-        analysis += f"для маршрута по {terrain_desc}. "
-        
-        if difficulty_factor > 2.0:
-            analysis += "Маршрут имеет высокую сложность. "
-        elif difficulty_factor > 1.5:
-            analysis += "Маршрут средней сложности. "
-        else:
-            analysis += "Относительно простой маршрут. "
-        
-        if pls_points >= 800:
-            analysis += "Отличная производительность!"
-        elif pls_points >= 600:
-            analysis += "Хорошая производительность."
-        else:
-            analysis += "Есть потенциал для улучшения."
-        
-        return analysis
-
     def calculate_user_pls_score(self, user_activities: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Рассчитывает общий PLS Score пользователя на основе последних активностей.
@@ -238,54 +271,121 @@ class PeakLineScoreCalculator:
         if not user_activities:
             return None
         
-        # Рассчитываем PLS для каждой активности
-        pls_scores = []
-        for activity in user_activities:
-            score_data = self.calculate_score(activity)
-            if score_data:
-                pls_scores.append({
-                    'activity_id': activity.get('id'),
-                    'activity_name': activity.get('name', 'Unknown'),
-                    'date': activity.get('start_date'),
-                    'pls_points': score_data['pls_points'],
-                    'terrain_type': score_data['terrain_type'],
-                    'performance_level': score_data['performance_level']
-                })
-        
-        if not pls_scores:
+        # Отбираем активности, для которых можно рассчитать PLS
+        valid_activities = [
+            activity for activity in user_activities if self._validate_activity_data(activity)
+        ]
+        if not valid_activities:
             return None
         
-        # Сортируем по баллам (лучшие сначала)
-        pls_scores.sort(key=lambda x: x['pls_points'], reverse=True)
+        # Рассчитываем PLS для всех активностей одним пакетом
+        pls_points, terrain_idx = self._calculate_scores_batch(valid_activities)
+        performance_levels = _PERFORMANCE_LEVELS_ARRAY[np.digitize(pls_points, _PERFORMANCE_THRESHOLDS)]
         
-        # Берем топ-6 результатов
-        top_scores = pls_scores[:6]
+        pls_scores = []
+        for activity, points, terrain, level in zip(
+            valid_activities, pls_points.tolist(), terrain_idx.tolist(), performance_levels.tolist()
+        ):
+            pls_scores.append({
+                'activity_id': activity.get('id'),
+                'activity_name': activity.get('name', 'Unknown'),
+                'date': activity.get('start_date'),
+                'pls_points': points,
+                'terrain_type': _TERRAIN_TYPES[terrain],
+                'performance_level': level
+            })
+        
+        # Берем топ-6 результатов (лучшие сначала; при равных баллах - в исходном порядке)
+        top_idx = np.argsort(-pls_points, kind='stable')[:6]
+        top_scores = [pls_scores[i] for i in top_idx.tolist()]
         
         # Рассчитываем средний балл
-        average_pls = sum(score['pls_points'] for score in top_scores) / len(top_scores)
+        average_pls = float(pls_points[top_idx].mean())
+        
+        # Для тренда нужны последние 3 результата в хронологическом порядке
+        dated_scores = sorted((score for score in pls_scores if score['date']), key=itemgetter('date'))
+        recent_pls_points = [score['pls_points'] for score in dated_scores[-3:]]
+        
+        logger.info("Batch PLS: %d activities, avg=%.1f", len(pls_scores), average_pls)
         
         result = {
             'overall_pls_score': round(average_pls, 1),
             'performance_level': self._get_performance_level(int(average_pls)),
             'top_scores': top_scores,
             'total_activities_analyzed': len(pls_scores),
-            'improvement_potential': self._calculate_improvement_potential(pls_scores)
+            'improvement_potential': self._calculate_improvement_potential(recent_pls_points)
         }
         
         return result
     
-    def _calculate_improvement_potential(self, pls_scores: List[Dict[str, Any]]) -> str:
-        """Анализирует потенциал для улучшения"""
-        if len(pls_scores) < 3:
-            return "Недостаточно данных для анализа тренда"
+    def _calculate_scores_batch(
+        self, activities: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Пакетный расчет PLS для списка активностей.
+        
+        Повторяет формулы calculate_score, но считает все активности сразу:
+        JIT-ядром numba, если оно доступно, иначе векторно через NumPy.
+        Активности должны быть заранее провалидированы (_validate_activity_data).
+        
+        Returns:
+            Кортеж массивов: pls_points и индекс типа местности в _TERRAIN_TYPES
+        """
+        count = len(activities)
+        dist_m = np.fromiter((a['distance'] for a in activities), dtype=np.float64, count=count)
+        mt_s = np.fromiter((a['moving_time'] for a in activities), dtype=np.float64, count=count)
+        elev = np.fromiter(
+            (a.get('total_elevation_gain', 0) for a in activities), dtype=np.float64, count=count
+        )
+        
+        # Параметры супер-атлета по типу активности - та же таблица, что и в calculate_score
+        type_params = [_TYPE_PARAMS.get(a.get('type', 'Ride'), _RIDE_PARAMS) for a in activities]
+        base_speed = np.fromiter((p[0] for p in type_params), dtype=np.float64, count=count)
+        climbing_penalty = np.fromiter((p[1] for p in type_params), dtype=np.float64, count=count)
+        
+        if score_kernel_batch is not None:
+            return score_kernel_batch(
+                dist_m, mt_s, elev, base_speed, climbing_penalty,
+                _TERRAIN_THRESHOLDS_ARRAY, _TERRAIN_COEFFICIENTS_ARRAY
+            )
+        return self._calculate_scores_vectorized(dist_m, mt_s, elev, base_speed, climbing_penalty)
+    
+    def _calculate_scores_vectorized(
+        self, dist_m: np.ndarray, mt_s: np.ndarray, elev: np.ndarray, base_speed: np.ndarray,
+        climbing_penalty: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Векторизованный (NumPy) вариант пакетного расчета PLS"""
+        count = len(dist_m)
+        dist_km = dist_m / 1000
+        mt_hours = mt_s / 3600
         
-        # Смотрим на последние 3 результата
-        recent_scores = [score['pls_points'] for score in pls_scores[-3:]]
+        # Классификация местности
+        terrain_idx = np.digitize(elev / dist_km, _TERRAIN_THRESHOLDS)
         
-        # Проверяем тренд
-        if recent_scores[-1] > recent_scores[0]:
+        # Идеальное время: (равнина + штраф за набор высоты) * коэффициент сложности
+        ideal_time = (dist_km / base_speed + elev * climbing_penalty / 6000) * _TERRAIN_COEFFICIENTS_ARRAY[terrain_idx]
+        
+        # Баллы от 0 до 1000 (переполнение до inf допустимо - значение все равно ограничивается)
+        with np.errstate(over='ignore'):
+            time_ratio = np.divide(ideal_time, mt_hours, out=np.zeros(count), where=mt_hours > 0)
+            pls_points = np.clip(time_ratio * 1000, 0, 1000).astype(np.int64)
+        
+        return pls_points, terrain_idx
+    
+    def _calculate_improvement_potential(self, recent_pls_points: List[int]) -> str:
+        """
+        Анализирует потенциал для улучшения.
+        
+        Args:
+            recent_pls_points: баллы последних 3 активностей в хронологическом порядке
+        """
+        if len(recent_pls_points) < 3:
+            return "Недостаточно данных для анализа тренда"
+        
+        # Проверяем тренд: последний результат против первого
+        if recent_pls_points[-1] > recent_pls_points[0]:
             return "Положительная динамика - продолжайте в том же духе!"
-        elif recent_scores[-1] < recent_scores[0]:
+        elif recent_pls_points[-1] < recent_pls_points[0]:
             return "Есть потенциал для улучшения - проанализируйте тренировочный процесс"
         else:
             return "Стабильные результаты - попробуйте новые вызовы"
@@ -293,13 +393,15 @@ class PeakLineScoreCalculator:
 
 # Вспомогательные функции для интеграции с существующим кодом
 
+# Калькулятор не хранит состояния, поэтому один экземпляр переиспользуется всеми вызовами
+_CALCULATOR = PeakLineScoreCalculator()
+
 def calculate_peakline_score_for_activity(activity_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Удобная функция для расчета PLS для одной активности.
     Интегрируется с существующим analyze_activity().
     """
-    calculator = PeakLineScoreCalculator()
-    return calculator.calculate_score(activity_data)
+    return _CALCULATOR.calculate_score(activity_data)
 
 def add_pls_to_activity_analysis(analysis_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -326,6 +428,14 @@ def add_pls_to_activity_analysis(analysis_data: Dict[str, Any]) -> Dict[str, Any
     
     if pls_data:
         analysis_data['peakline_score'] = pls_data
-        logger.info(f"Added PLS {pls_data['pls_points']} to activity analysis")
+        logger.debug("Added PLS %d to activity analysis", pls_data['pls_points'])
     
-    return analysis_data 
+    return analysis_data
+
+# Прогреваем JIT-ядро при импорте. Его использует только calculate_user_pls_score
+# (страница PLS и лидерборд): без прогрева первый такой запрос платил бы за
+# компиляцию. calculate_score и analyze_activity считают на чистом Python и от
+# прогрева не зависят. Прогрев идет в импортирующем (главном) потоке: пул потоков
+# numba (TBB), впервые запущенный из фонового потока, может повесить процесс при завершении.
+if warmup_kernels is not None:
+    warmup_kernels(_TERRAIN_THRESHOLDS_ARRAY, _TERRAIN_COEFFICIENTS_ARRAY)
@@ -0,0 +1,82 @@
+# /opt/strava-web/utils/peakline_score_numba.py
+
+import logging
+
+import numpy as np
+from numba import njit, prange
+
+logger = logging.getLogger(__name__)
+
+# Параметры модели (скорости, штрафы, пороги и коэффициенты местности) передаются
+# аргументами: единственный источник констант - peakline_score.py
+
+
+@njit(cache=True)
+def score_kernel(dist_m, moving_time_s, elev_m, base_speed_kmh, climbing_penalty,
+                 terrain_thresholds, terrain_coefficients):
+    """
+    Числовое ядро PeakLine Score для одной активности.
+
+    Повторяет формулы PeakLineScoreCalculator.calculate_score на обычных float.
+    Дистанция должна быть больше нуля.
+
+    Returns:
+        (pls_points, индекс типа местности в terrain_coefficients)
+    """
+    distance_km = dist_m / 1000.0
+    actual_time_hours = moving_time_s / 3600.0
+
+    # Тип местности - число порогов, не превышающих набор на км (как bisect_right)
+    elevation_per_km = elev_m / distance_km
+    terrain_code = 0
+    while terrain_code < terrain_thresholds.shape[0] and elevation_per_km >= terrain_thresholds[terrain_code]:
+        terrain_code += 1
+
+    ideal_time = (distance_km / base_speed_kmh + elev_m * climbing_penalty / 6000.0) * terrain_coefficients[terrain_code]
+
+    time_ratio = ideal_time / actual_time_hours if actual_time_hours > 0 else 0.0
+
+    # Баллы от 0 до 1000 (ограничиваем до приведения к int, чтобы не переполнить)
+    points = time_ratio * 1000.0
+    if points >= 1000.0:
+        pls_points = 1000
+    elif points <= 0.0:
+        pls_points = 0
+    else:
+        pls_points = int(points)
+
+    return pls_points, terrain_code
+
+
+@njit(cache=True, parallel=True)
+def score_kernel_batch(dist_arr, mt_arr, elev_arr, base_speed_arr, climbing_penalty_arr,
+                       terrain_thresholds, terrain_coefficients):
+    """
+    Пакетная версия score_kernel: считает активности параллельно.
+
+    Returns:
+        Кортеж массивов: pls_points и индекс типа местности
+    """
+    count = dist_arr.shape[0]
+    pls_points = np.empty(count, dtype=np.int64)
+    terrain_idx = np.empty(count, dtype=np.int64)
+
+    for i in prange(count):
+        pls_points[i], terrain_idx[i] = score_kernel(
+            dist_arr[i], mt_arr[i], elev_arr[i], base_speed_arr[i], climbing_penalty_arr[i],
+            terrain_thresholds, terrain_coefficients
+        )
+
+    return pls_points, terrain_idx
+
+
+def warmup_kernels(terrain_thresholds, terrain_coefficients) -> None:
+    """
+    Компилирует пакетное ядро заранее (или загружает его из кэша numba на диске).
+    Без прогрева компиляция происходит при первом вызове и блокирует вызывающий код.
+    """
+    try:
+        sample = np.ones(1)
+        score_kernel_batch(sample, sample, sample, sample, sample, terrain_thresholds, terrain_coefficients)
+    except Exception:
+        logger.exception("Numba kernel warmup failed, kernels will compile on first use")
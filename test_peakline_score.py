@@ -0,0 +1,114 @@
+import random
+
+import numpy as np
+import pytest
+
+import peakline_score
+
+
+def _make_activities(count=2000, seed=0):
+    rng = random.Random(seed)
+    activities = []
+    for i in range(count):
+        distance = rng.uniform(100, 200000)
+        activities.append({
+            'id': i,
+            'distance': distance,
+            'moving_time': distance / rng.uniform(1, 8),
+            'total_elevation_gain': distance * rng.uniform(0, 0.08),
+            'type': rng.choice(['Run', 'Ride', 'VirtualRide']),
+        })
+
+    # Граничные случаи: ровно на порогах местности (10/30/60 м/км) и на пределах баллов
+    for elevation_per_km in (0, 10, 30, 60, 100):
+        for activity_type in ('Run', 'Ride'):
+            activities.append({
+                'distance': 10000,
+                'moving_time': 1800,
+                'total_elevation_gain': elevation_per_km * 10,
+                'type': activity_type,
+            })
+    activities.append({'distance': 1000, 'moving_time': 1, 'type': 'Ride'})
+    activities.append({'distance': 1000, 'moving_time': 10 ** 9, 'type': 'Run'})
+    return activities
+
+
+def _scalar_scores(activities):
+    calculator = peakline_score.PeakLineScoreCalculator()
+    results = [calculator.calculate_score(activity) for activity in activities]
+    return [r['pls_points'] for r in results], [r['terrain_type'] for r in results]
+
+
+def _batch_scores(monkeypatch, kernel, activities):
+    monkeypatch.setattr(peakline_score, 'score_kernel_batch', kernel)
+    pls_points, terrain_idx = peakline_score.PeakLineScoreCalculator()._calculate_scores_batch(activities)
+    return pls_points.tolist(), [peakline_score._TERRAIN_TYPES[i] for i in terrain_idx.tolist()]
+
+
+def test_numpy_batch_matches_calculate_score(monkeypatch):
+    activities = _make_activities()
+    assert _batch_scores(monkeypatch, None, activities) == _scalar_scores(activities)
+
+
+def test_numba_batch_matches_calculate_score(monkeypatch):
+    numba_kernels = pytest.importorskip('peakline_score_numba')
+    activities = _make_activities()
+    assert _batch_scores(monkeypatch, numba_kernels.score_kernel_batch, activities) == _scalar_scores(activities)
+
+
+def _run(start_date, moving_time):
+    # 10 км по равнине: идеальное время 0.5 ч, баллы растут с уменьшением moving_time
+    activity = {'distance': 10000, 'moving_time': moving_time, 'total_elevation_gain': 0, 'type': 'Run'}
+    if start_date is not None:
+        activity['start_date'] = start_date
+    return activity
+
+
+def test_improvement_trend_follows_start_date_not_input_order():
+    activities = [
+        _run('2025-01-03T08:00:00Z', 2600),
+        _run('2025-01-01T08:00:00Z', 3600),
+        _run('2025-01-02T08:00:00Z', 3000),
+    ]
+    result = peakline_score.PeakLineScoreCalculator().calculate_user_pls_score(activities)
+    assert result['improvement_potential'] == "Положительная динамика - продолжайте в том же духе!"
+
+
+def test_improvement_trend_skips_activities_without_start_date():
+    calculator = peakline_score.PeakLineScoreCalculator()
+    activities = [
+        _run('2025-01-01T08:00:00Z', 2600),
+        _run('2025-01-02T08:00:00Z', 3000),
+        _run(None, 1800),
+    ]
+    result = calculator.calculate_user_pls_score(activities)
+    assert result['improvement_potential'] == "Недостаточно данных для анализа тренда"
+
+    activities.append(_run('2025-01-03T08:00:00Z', 3600))
+    result = calculator.calculate_user_pls_score(activities)
+    assert result['improvement_potential'] == "Есть потенциал для улучшения - проанализируйте тренировочный процесс"
+    assert result['total_activities_analyzed'] == 4
+
+
+@pytest.mark.parametrize('bad_value', [True, False, float('nan'), float('inf'), -float('inf'), None, '1000', 10 ** 400])
+def test_validation_rejects_non_numeric_and_non_finite_values(bad_value):
+    calculator = peakline_score.PeakLineScoreCalculator()
+    for field in ('distance', 'moving_time', 'total_elevation_gain'):
+        activity = {'distance': 10000, 'moving_time': 1800, 'total_elevation_gain': 100}
+        activity[field] = bad_value
+        assert calculator.calculate_score(activity) is None
+        assert calculator.calculate_user_pls_score([activity]) is None
+
+
+def test_validation_accepts_numpy_numbers():
+    activity = {'distance': np.int64(10000), 'moving_time': np.float64(1800), 'total_elevation_gain': np.int32(100)}
+    result = peakline_score.PeakLineScoreCalculator().calculate_score(activity)
+    assert result['pls_points'] == peakline_score.PeakLineScoreCalculator().calculate_score(
+        {'distance': 10000, 'moving_time': 1800, 'total_elevation_gain': 100}
+    )['pls_points']
+
+
+def test_extreme_time_ratio_is_clamped_without_overflow(monkeypatch):
+    activity = {'distance': 1e300, 'moving_time': 1e-300}
+    assert peakline_score.PeakLineScoreCalculator().calculate_score(activity)['pls_points'] == 1000
+    assert _batch_scores(monkeypatch, None, [activity])[0] == [1000]